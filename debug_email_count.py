@@ -45,20 +45,25 @@ def main():
 
         total_rows = 0
         working_selector = None
+        rows = []
         
+        # One wait over the combined selector instead of a 10s wait per selector
+        combined_selector = ", ".join(email_row_selectors)
+        try:
+            WebDriverWait(gmail_monitor.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, combined_selector))
+            )
+        except:
+            pass
+        
+        # Cheap per-selector probe (no waiting) to report which one matched
         for selector in email_row_selectors:
-            try:
-                WebDriverWait(gmail_monitor.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                rows = gmail_monitor.driver.find_elements(By.CSS_SELECTOR, selector)
-                if rows:
-                    total_rows = len(rows)
-                    working_selector = selector
-                    print(f"✅ Found {total_rows} email rows using selector: {selector}")
-                    break
-            except:
-                continue
+            rows = gmail_monitor.driver.find_elements(By.CSS_SELECTOR, selector)
+            if rows:
+                total_rows = len(rows)
+                working_selector = selector
+                print(f"✅ Found {total_rows} email rows using selector: {selector}")
+                break
 
         if not total_rows:
             print("❌ No email rows found with any selector")
@@ -75,12 +80,13 @@ def main():
         failed_count = 0
         no_body_count = 0
         
-        for i, row in enumerate(rows[:20], 1):
+        # Read all row IDs and metadata in one script call, before any email is opened
+        inbox_rows = gmail_monitor._list_inbox_rows([working_selector], 20)
+        
+        for i, metadata in enumerate(inbox_rows, 1):
             try:
                 print(f"\n   Email {i}:")
-                
-                # Get email ID
-                email_id = gmail_monitor._get_email_id(row)
+                email_id = metadata.get('id')
                 print(f"      ID: {email_id}")
                 
                 if not email_id:
@@ -93,7 +99,7 @@ def main():
                     continue
                 
                 # Try to extract email data
-                email_data = gmail_monitor._extract_email_data(row)
+                email_data = gmail_monitor._extract_email_data(metadata['row'], metadata)
                 
                 if not email_data:
                     print(f"      ❌ Failed to extract email data")
@@ -111,7 +117,7 @@ def main():
                 print(f"      Body length: {len(email_data.get('body', ''))} chars")
                 
                 processed_count += 1
-                gmail_monitor.processed_emails.add(email_id)
+                gmail_monitor.processed_emails.mark_processed(email_id)
                 
             except Exception as e:
                 print(f"      ❌ Error: {str(e)[:100]}...")
@@ -126,7 +132,7 @@ def main():
         if processed_count < 20:
             print(f"\n💡 REASONS FOR LIMITED PROCESSING:")
             if failed_count > 0:
-                print(f"   • {failed_count} emails failed due to click interception or extraction errors")
+                print(f"   • {failed_count} emails failed due to missing thread IDs or extraction errors")
             if no_body_count > 0:
                 print(f"   • {no_body_count} emails had no extractable body content")
             if total_rows < 20:
@@ -0,0 +1,272 @@
+"""
+Gmail IMAP Monitor Module for URL Scanner Bot
+
+Handles Gmail authentication and email retrieval over IMAP.
+Provides the same email dicts as the Selenium-based GmailMonitor without running a browser.
+"""
+
+import email
+import imaplib
+import logging
+import re
+import select
+import ssl
+import time
+from email import policy
+from typing import Dict, List, Optional
+from processed_emails import ProcessedEmails
+
+logger = logging.getLogger(__name__)
+
+class GmailImapMonitor:
+    """
+    Gmail monitoring and email extraction class backed by IMAP.
+
+    Fetches message sources directly from imap.gmail.com, so no Chrome process,
+    DOM scraping or page-load waits are involved. Requires IMAP access and an
+    app password on the Gmail account.
+    """
+
+    def __init__(self, username: str, password: str, host: str = "imap.gmail.com", mailbox: str = "INBOX",
+                 max_processed_emails: int = 50000, fetch_batch_size: int = 100):
+        """Initialize the IMAP monitor with credentials."""
+        self.username = username
+        self.password = password
+        self.host = host
+        self.mailbox = mailbox
+        self.connection = None
+        # Bounded LRU of processed email IDs so long-running monitors don't grow without limit
+        self.processed_emails = ProcessedEmails(max_processed_emails)
+        self.fetch_batch_size = fetch_batch_size
+
+    def login_gmail(self) -> bool:
+        """Connect to the IMAP server, login and select the mailbox."""
+        try:
+            logger.info("Attempting to login to Gmail over IMAP...")
+            self.connection = imaplib.IMAP4_SSL(self.host)
+            self.connection.login(self.username, self.password)
+            # Read-only, so the CLOSE on teardown can never expunge \Deleted messages
+            typ, _ = self.connection.select(self.mailbox, readonly=True)
+            if typ != "OK":
+                logger.error("Could not select mailbox %s", self.mailbox)
+                return False
+
+            logger.info("Successfully logged into Gmail over IMAP")
+            return True
+
+        except imaplib.IMAP4.error as e:
+            logger.error("IMAP login failed: %s", e)
+            print(f"Error during login: {e}")
+            return False
+        except Exception as e:
+            logger.error("Error connecting to IMAP server: %s", e)
+            print(f"Error during login: {e}")
+            return False
+
+    def get_new_emails(self, max_emails: int = 10) -> list:
+        """
+        Get new emails from the Gmail inbox.
+
+        Takes the most recent messages (newest first, like the inbox view) and fetches
+        all unprocessed ones in a single UID FETCH round-trip.
+        """
+        try:
+            typ, data = self.connection.uid("SEARCH", None, "ALL")
+            if typ != "OK" or not data or not data[0]:
+                return []
+
+            recent_uids = data[0].split()[-max_emails:][::-1]
+            uids = [uid.decode() for uid in recent_uids if not self.processed_emails.is_processed(uid.decode())]
+            if not uids:
+                return []
+
+            messages = self._fetch_messages(uids)
+
+            new_emails = []
+            for uid in uids:
+                raw_message = messages.get(uid)
+                if not raw_message:
+                    continue
+                email_data = self._extract_email_data(raw_message)
+                if email_data and email_data.get('body'):
+                    email_data['id'] = uid
+                    new_emails.append(email_data)
+                    self.processed_emails.mark_processed(uid)
+            return new_emails
+        except Exception as e:
+            logger.warning("Error fetching emails over IMAP: %s", e)
+            return []
+
+    def _fetch_messages(self, uids: List[str]) -> Dict[str, bytes]:
+        """
+        Fetch raw message sources for the given UIDs, keyed by UID.
+
+        Issues one UID FETCH per batch of fetch_batch_size messages, so large backlogs
+        take a handful of round-trips without building one huge command line.
+        """
+        messages = {}
+        for start in range(0, len(uids), self.fetch_batch_size):
+            batch = uids[start:start + self.fetch_batch_size]
+            # BODY.PEEK leaves the \Seen flag untouched
+            typ, data = self.connection.uid("FETCH", ",".join(batch), "(BODY.PEEK[])")
+            if typ != "OK":
+                continue
+
+            for item in data:
+                if not isinstance(item, tuple):
+                    continue
+                match = re.search(rb"UID (\d+)", item[0])
+                if match:
+                    messages[match.group(1).decode()] = item[1]
+        return messages
+
+    def _extract_email_data(self, raw_message: bytes) -> Optional[Dict]:
+        """
+        Extract email data from a raw RFC 822 message.
+
+        Prefers the plain text part for the body and falls back to the HTML part.
+        """
+        try:
+            message = email.message_from_bytes(raw_message, policy=policy.default)
+
+            body = ""
+            body_part = message.get_body(preferencelist=('plain', 'html'))
+            if body_part is not None:
+                body = body_part.get_content()
+
+            return {
+                'sender': str(message.get('From', '')).strip(),
+                'subject': str(message.get('Subject', '')).strip(),
+                'timestamp': str(message.get('Date', '')).strip(),
+                'body': body
+            }
+
+        except Exception as e:
+            logger.warning("Error extracting email data: %s", e)
+            return None
+
+    def mark_email_as_read(self, email_id: str) -> bool:
+        """Mark an email as read."""
+        return self.mark_emails_as_read([email_id])
+
+    def mark_emails_as_read(self, email_ids: List[str]) -> bool:
+        """
+        Mark a batch of emails as read with a single UID STORE command.
+
+        The mailbox is only opened read-write for the STORE and re-selected read-only afterwards.
+        """
+        if not email_ids:
+            return True
+        try:
+            typ, _ = self.connection.select(self.mailbox)
+            if typ != "OK":
+                return False
+            try:
+                typ, _ = self.connection.uid("STORE", ",".join(email_ids), "+FLAGS", "(\\Seen)")
+                return typ == "OK"
+            finally:
+                self.connection.select(self.mailbox, readonly=True)
+        except Exception as e:
+            logger.warning("Error marking emails as read: %s", e)
+            return False
+
+    def wait_for_new_mail(self, timeout: float = 29 * 60) -> bool:
+        """
+        Block until the server reports new mail or the timeout expires, using IMAP IDLE.
+
+        Replaces polling with refresh_inbox: the connection sits idle and the server pushes
+        an EXISTS update as soon as a message arrives. Gmail drops IDLE after ~29 minutes,
+        so callers should loop on this with timeouts below that.
+        """
+        try:
+            tag = self.connection._new_tag()
+            self.connection.send(tag + b" IDLE\r\n")
+            if not self.connection.readline().startswith(b"+"):
+                logger.warning("Server refused IDLE")
+                return False
+
+            sock = self.connection.sock
+            deadline = time.monotonic() + timeout
+            new_mail = False
+            while not new_mail:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Lines already pulled into imaplib's read buffer (or the SSL layer) don't show up in select()
+                if not self._has_buffered_data() and not select.select([sock], [], [], remaining)[0]:
+                    break
+                new_mail = b"EXISTS" in self._idle_readline()
+
+            self.connection.send(b"DONE\r\n")
+            while not self._idle_readline().startswith(tag):
+                continue
+            return new_mail
+
+        except Exception as e:
+            logger.warning("Error waiting for new mail: %s", e)
+            return False
+
+    def _has_buffered_data(self) -> bool:
+        """Check without blocking whether server data is already waiting to be read."""
+        # imaplib reads through a BufferedReader, so a single recv can pull several lines
+        # off the socket; peek on a non-blocking socket returns them without waiting
+        sock = self.connection.sock
+        previous_timeout = sock.gettimeout()
+        sock.setblocking(False)
+        try:
+            return bool(self.connection.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            sock.settimeout(previous_timeout)
+
+    def _idle_readline(self) -> bytes:
+        """Read one server line during IDLE, treating EOF as a dropped connection."""
+        # imaplib returns b'' at EOF rather than raising, and the closed socket stays readable
+        line = self.connection.readline()
+        if not line:
+            raise self.connection.abort("connection closed during IDLE")
+        return line
+
+    def refresh_inbox(self):
+        """Ask the server for mailbox updates."""
+        try:
+            self.connection.noop()
+        except Exception as e:
+            logger.warning("Error refreshing inbox: %s", e)
+
+    def is_logged_in(self) -> bool:
+        """Check if currently logged into Gmail."""
+        try:
+            return self.connection is not None and self.connection.state == "SELECTED"
+        except:
+            return False
+
+    def logout(self):
+        """Logout from the IMAP server."""
+        try:
+            if self.connection:
+                self.connection.logout()
+        except Exception as e:
+            logger.warning("Error logging out: %s", e)
+        finally:
+            self.connection = None
+
+    def close(self):
+        """Close the IMAP connection and cleanup resources."""
+        if not self.connection:
+            return
+        try:
+            self.connection.close()
+        except Exception as e:
+            logger.error("Error closing IMAP connection: %s", e)
+        self.logout()
+        logger.info("IMAP connection closed successfully")
+
+    def __enter__(self):
+        """Context manager entry point."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit point - ensures cleanup."""
+        self.close()
@@ -5,15 +5,209 @@ Handles Gmail authentication, email retrieval, and content extraction using Sele
 Provides browser automation for Gmail with robust error handling and fallback mechanisms.
 """
 
-import time
 import logging
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from processed_emails import ProcessedEmails
+
+logger = logging.getLogger(__name__)
+
+# Resources the bot never needs, since it only reads text
+_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf",
+    "*.mp4", "*.webm",
+    "*googletagmanager*", "*google-analytics*"
+]
+
+# Alternatives for each page element, combined into one CSS selector so a single
+# wait or query covers all of them instead of one round-trip per alternative
+_EMAIL_INPUT_SELECTOR = ", ".join([
+    "input[name='identifier']",
+    "input[type='email']",
+    "input[data-testid='identifier']",
+    "#identifierId",
+    "input[aria-label*='Email']",
+    "input[placeholder*='email']"
+])
+_PASSWORD_INPUT_SELECTOR = ", ".join([
+    "input[name='password']",
+    "input[type='password']",
+    "input[data-testid='password']",
+    "input[aria-label*='Password']",
+    "input[placeholder*='password']"
+])
+_GMAIL_LOADED_SELECTOR = ", ".join([
+    "div[role='main']",
+    "div[data-testid='inbox']",
+    "div[aria-label*='Inbox']",
+    "div[data-tooltip*='Inbox']"
+])
+
+# Cookie fields accepted by CDP Network.setCookie
+_CDP_COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+# Fallback for the login Next buttons when their element ID lookup misses
+_NEXT_BUTTON_SELECTOR = "button[type='submit'], button[jsname='LgbsSe']"
+
+# Inbox row selectors in order of preference
+_EMAIL_ROW_SELECTORS = [
+    "tr[role='row']",
+    "div[role='row']",
+    "div[data-testid='message-row']",
+    "div[class*='message-row']",
+    "tr[class*='message']"
+]
+
+# Inbox row metadata selectors, tried in order
+_SENDER_SELECTORS = [
+    "td[data-tooltip]",
+    "td[title]",
+    "td[aria-label*='@']",
+    "td span[email]",
+    "td[class*='sender']",
+    "td[class*='from']",
+    "td[role='gridcell'] span[email]",
+    "td[role='gridcell'] span[title*='@']",
+    "td[role='gridcell'] span[aria-label*='@']",
+    "td span[title*='@']",
+    "td span[aria-label*='@']"
+]
+_SUBJECT_SELECTORS = [
+    "td[data-thread-id] span",
+    "td[class*='subject'] span",
+    "td span[class*='subject']",
+    "td[aria-label*='Subject']",
+    "td span[dir='ltr']",
+    "td[class*='message'] span"
+]
+_TIMESTAMP_SELECTORS = [
+    "td[data-tooltip] span",
+    "td[class*='date']",
+    "td[aria-label*='Date']",
+    "td span[class*='date']"
+]
+
+# Reads the ID, sender, subject and timestamp of an inbox row inside the browser,
+# trying each selector list in order like the old per-selector find_element loops.
+_ROW_METADATA_FUNCTION = """
+function (row, senderSelectors, subjectSelectors, timestampSelectors) {
+    function textOf(el) {
+        return el.innerText || '';
+    }
+
+    function firstText(selectors) {
+        var text = '';
+        for (var i = 0; i < selectors.length; i++) {
+            var el = row.querySelector(selectors[i]);
+            if (!el) continue;
+            text = textOf(el);
+            if (text) break;
+        }
+        return text;
+    }
+
+    var sender = '';
+    for (var i = 0; i < senderSelectors.length; i++) {
+        var el = row.querySelector(senderSelectors[i]);
+        if (!el) continue;
+        sender = el.getAttribute('data-tooltip') || el.getAttribute('title') ||
+                 el.getAttribute('aria-label') || textOf(el);
+        if (sender && sender.indexOf('@') !== -1 && sender !== 'Select') break;
+    }
+
+    var id = row.getAttribute('id') || row.getAttribute('data-legacy-thread-id') ||
+             row.getAttribute('data-thread-id');
+    if (id && id.indexOf('thread-') === 0) {
+        id = id.replace('thread-', '');
+    }
+
+    // Hex thread ID used by Gmail's #inbox/<thread> deep links
+    var threadEl = row.hasAttribute('data-legacy-thread-id') ? row : row.querySelector('[data-legacy-thread-id]');
+
+    return {
+        row: row,
+        id: id || null,
+        thread_id: threadEl ? threadEl.getAttribute('data-legacy-thread-id') : null,
+        sender: sender,
+        subject: firstText(subjectSelectors),
+        timestamp: firstText(timestampSelectors)
+    };
+}
+"""
+
+_INBOX_URL = "https://mail.google.com/mail/u/0/#inbox"
+
+_ROW_METADATA_SCRIPT = "return (" + _ROW_METADATA_FUNCTION + ")(arguments[0], arguments[1], arguments[2], arguments[3]);"
+
+# Same as above for the first N rows of the first row selector that matches, in one round-trip
+_INBOX_LIST_SCRIPT = """
+var rowMetadata = """ + _ROW_METADATA_FUNCTION + """;
+var args = arguments;
+var rows = [];
+for (var i = 0; i < args[0].length && !rows.length; i++) {
+    rows = Array.prototype.slice.call(document.querySelectorAll(args[0][i]), 0, args[1]);
+}
+return rows.map(function (row) {
+    return rowMetadata(row, args[2], args[3], args[4]);
+});
+"""
+
+# Returns the first element text longer than 20 characters, trying the selectors in order,
+# along with the selector that found it; falls back to the whole main area's text
+_EMAIL_BODY_SCRIPT = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var elements = document.querySelectorAll(selectors[i]);
+    for (var j = 0; j < elements.length; j++) {
+        var text = elements[j].innerText;
+        if (text && text.length > 20) {
+            return {text: text, selector: selectors[i]};
+        }
+    }
+}
+var main = document.querySelector("div[role='main']");
+return {text: main ? main.innerText : '', selector: null};
+"""
+
+# Ticks the checkbox of every inbox row whose ID is in the given list; returns how many were ticked
+_SELECT_ROWS_SCRIPT = """
+var rowMetadata = """ + _ROW_METADATA_FUNCTION + """;
+var wanted = arguments[1];
+var rows = [];
+for (var i = 0; i < arguments[0].length && !rows.length; i++) {
+    rows = Array.prototype.slice.call(document.querySelectorAll(arguments[0][i]));
+}
+var selected = 0;
+rows.forEach(function (row) {
+    var id = rowMetadata(row, [], [], []).id;
+    var checkbox = row.querySelector("div[role='checkbox']");
+    if (id && wanted.indexOf(id) !== -1 && checkbox) {
+        if (checkbox.getAttribute('aria-checked') !== 'true') checkbox.click();
+        selected++;
+    }
+});
+return selected;
+"""
+
+def _visible_element(selector: str):
+    """Wait condition returning the first displayed and enabled element matching a CSS selector."""
+    def condition(driver):
+        for element in driver.find_elements(By.CSS_SELECTOR, selector):
+            if element.is_displayed() and element.is_enabled():
+                return element
+        return False
+    return condition
 
 class GmailMonitor:
     """
@@ -23,13 +217,24 @@ class GmailMonitor:
     Handles login, email retrieval, and content extraction with robust error handling.
     """
     
-    def __init__(self, username: str, password: str, headless: bool = True):
-        """Initialize the Gmail monitor with credentials."""
+    def __init__(self, username: str, password: str, headless: bool = True, workers: int = 1,
+                 profile_dir: Optional[str] = "~/.gmail_bot_profile", max_processed_emails: int = 50000):
+        """
+        Initialize the Gmail monitor with credentials.
+        
+        The Chrome profile in profile_dir keeps the Google session between runs so later
+        runs can skip the login form; pass None to start from a fresh profile every time.
+        """
         self.username = username
         self.password = password
         self.headless = headless
+        self.workers = max(1, workers)
+        self.profile_dir = os.path.expanduser(profile_dir) if profile_dir else None
         self.driver = None
-        self.processed_emails = set()
+        self._driver_pool = None
+        self._pool_drivers = []
+        # Bounded LRU of processed email IDs so long-running monitors don't grow without limit
+        self.processed_emails = ProcessedEmails(max_processed_emails)
         self.wait_timeout = 20  # Increased timeout for reliability
         
     def setup_driver(self) -> bool:
@@ -39,44 +244,91 @@ class GmailMonitor:
         Configures Chrome for Gmail automation with stealth settings and proper window sizing.
         """
         try:
-            chrome_options = Options()
-            
-            # Configure headless mode if requested
-            if self.headless:
-                chrome_options.add_argument("--headless")
-            else:
-                # For visible mode, ensure window is properly sized and positioned
-                chrome_options.add_argument("--window-size=1200,800")
-                chrome_options.add_argument("--window-position=100,100")
-                chrome_options.add_argument("--start-maximized")
-            
-            # Standard Chrome options for stability
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            # Add user agent to look more like a real browser
-            chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-            
-            # Create WebDriver instance
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.driver = self._create_driver(use_profile=True)
             
             # For visible mode, ensure window is front and center
             if not self.headless:
                 self.driver.maximize_window()
-                time.sleep(2)  # Give time for window to maximize
             
-            logging.info("Chrome WebDriver initialized successfully")
+            logger.info("Chrome WebDriver initialized successfully")
             return True
             
         except Exception as e:
-            logging.error(f"Failed to initialize WebDriver: {e}")
+            logger.error("Failed to initialize WebDriver: %s", e)
             return False
     
+    def _create_driver(self, use_profile: bool = False, headless: Optional[bool] = None):
+        """
+        Create a Chrome WebDriver instance with the bot's options.
+        
+        Only the main driver uses the persistent profile, since Chrome locks a profile
+        directory to a single running instance. headless overrides the monitor's setting.
+        """
+        if headless is None:
+            headless = self.headless
+        chrome_options = Options()
+        
+        if use_profile and self.profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
+            chrome_options.add_argument("--profile-directory=Default")
+        
+        # Configure headless mode if requested
+        if headless:
+            chrome_options.add_argument("--headless")
+        else:
+            # For visible mode, ensure window is properly sized and positioned
+            chrome_options.add_argument("--window-size=1200,800")
+            chrome_options.add_argument("--window-position=100,100")
+            chrome_options.add_argument("--start-maximized")
+        
+        # Standard Chrome options for stability
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        
+        # Turn off background features the bot never uses to cut per-instance threads and memory
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-sync")
+        chrome_options.add_argument("--disable-translate")
+        chrome_options.add_argument("--disable-default-apps")
+        chrome_options.add_argument("--disable-component-update")
+        chrome_options.add_argument("--disable-notifications")
+        # Site isolation stays on: this browser holds the Google session and renders untrusted email content
+        chrome_options.add_argument("--disable-features=Translate,OptimizationHints,CalculateNativeWinOcclusion,"
+                                    "InterestFeedContentSuggestions")
+        chrome_options.add_argument("--no-first-run")
+        chrome_options.add_argument("--no-default-browser-check")
+        chrome_options.add_argument("--mute-audio")
+        
+        # Return from get() at DOMContentLoaded; every lookup after a navigation uses an explicit wait
+        chrome_options.page_load_strategy = "eager"
+        
+        # Don't download images; stylesheets stay enabled because visible-text reads depend on them
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2
+        })
+        
+        # Add user agent to look more like a real browser
+        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        
+        # Create WebDriver instance
+        driver = webdriver.Chrome(options=chrome_options)
+        # Probes use find_elements, which must return immediately when nothing matches
+        driver.implicitly_wait(0)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        
+        # Block fonts, media and trackers at the network layer as well
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            logger.warning("Could not enable resource blocking: %s", e)
+        return driver
+    
     def login_gmail(self) -> bool:
         """
         Login to Gmail using Selenium.
@@ -85,39 +337,42 @@ class GmailMonitor:
         and detailed feedback during the process.
         """
         try:
-            logging.info("Attempting to login to Gmail...")
+            logger.info("Attempting to login to Gmail...")
             print("Opening Gmail login page...")
-            self.driver.get("https://mail.google.com")
+            self.driver.get(_INBOX_URL)
             
-            # Wait for page to load
+            # Wait for either the login form or an already signed-in inbox
             print("Loading login page...")
-            time.sleep(5)
-            
-            # Try multiple selectors for email input
-            email_selectors = [
-                "input[name='identifier']",
-                "input[type='email']",
-                "input[data-testid='identifier']",
-                "#identifierId",
-                "input[aria-label*='Email']",
-                "input[placeholder*='email']"
-            ]
-            
-            email_input = None
-            for selector in email_selectors:
+            try:
+                WebDriverWait(self.driver, 15).until(EC.any_of(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "input[name='identifier']")),
+                    EC.url_contains("#inbox")
+                ))
+            except TimeoutException:
+                pass
+            
+            # A session saved in the Chrome profile lands straight in the inbox
+            if self._has_existing_session():
+                logger.info("Reusing existing Gmail session")
+                print("Already logged into Gmail!")
+                return True
+            
+            # Try the ID lookup first, then wait for any of the known email input variants
+            email_inputs = self.driver.find_elements(By.ID, "identifierId")
+            email_input = email_inputs[0] if email_inputs else None
+            if not email_input:
                 try:
-                    email_input = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                    email_input = WebDriverWait(self.driver, 15).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, _EMAIL_INPUT_SELECTOR))
                     )
-                    if email_input:
-                        logging.info(f"Found email input with selector: {selector}")
-                        print("Found email input field")
-                        break
-                except:
-                    continue
+                except TimeoutException:
+                    pass
+            if email_input:
+                logger.info("Found email input field")
+                print("Found email input field")
             
             if not email_input:
-                logging.error("Could not find email input field")
+                logger.error("Could not find email input field")
                 print("Could not find email input field")
                 return False
             
@@ -125,43 +380,31 @@ class GmailMonitor:
             print(f"Entering email: {self.username}")
             email_input.clear()
             email_input.send_keys(self.username)
-            time.sleep(2)
             
             # Submit email
             try:
-                next_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit'], #identifierNext, button[jsname='LgbsSe']")
+                next_button = self._find_next_button("identifierNext")
                 print("Clicking Next button...")
                 next_button.click()
-            except:
+            except Exception:
                 print("Submitting email...")
                 email_input.submit()
             
-            time.sleep(5)
-            
-            # Look for password input field
-            password_selectors = [
-                "input[name='password']",
-                "input[type='password']",
-                "input[data-testid='password']",
-                "input[aria-label*='Password']",
-                "input[placeholder*='password']"
-            ]
-            
+            # Look for any of the known password input variants
             password_input = None
-            for selector in password_selectors:
-                try:
-                    password_input = WebDriverWait(self.driver, 15).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if password_input:
-                        logging.info(f"Found password input with selector: {selector}")
-                        print("Found password input field")
-                        break
-                except:
-                    continue
+            try:
+                # The email step already holds a hidden password input, so only a visible,
+                # enabled match means the password step has actually loaded
+                password_input = WebDriverWait(
+                    self.driver, 15, ignored_exceptions=[StaleElementReferenceException]
+                ).until(_visible_element(_PASSWORD_INPUT_SELECTOR))
+                logger.info("Found password input field")
+                print("Found password input field")
+            except TimeoutException:
+                pass
             
             if not password_input:
-                logging.error("Could not find password input field")
+                logger.error("Could not find password input field")
                 print("Could not find password input field")
                 print("You may need to manually complete the login process")
                 return False
@@ -170,60 +413,77 @@ class GmailMonitor:
             print("Entering password...")
             password_input.clear()
             password_input.send_keys(self.password)
-            time.sleep(2)
             
             # Submit password
             try:
-                password_next = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit'], #passwordNext, button[jsname='LgbsSe']")
+                password_next = self._find_next_button("passwordNext")
                 print("Clicking Next button...")
                 password_next.click()
-            except:
+            except Exception:
                 print("Submitting password...")
                 password_input.submit()
             
             # Wait for Gmail to load
             print("Loading Gmail...")
-            time.sleep(8)
+            try:
+                WebDriverWait(self.driver, self.wait_timeout).until(EC.url_contains("mail.google.com"))
+            except TimeoutException:
+                pass
             
             # Check if login was successful
-            gmail_indicators = [
-                "div[role='main']",
-                "div[data-testid='inbox']",
-                "div[aria-label*='Inbox']",
-                "div[data-tooltip*='Inbox']"
-            ]
-            
-            for indicator in gmail_indicators:
-                try:
-                    WebDriverWait(self.driver, 15).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, indicator))
-                    )
-                    logging.info("Successfully logged into Gmail")
-                    print("Successfully logged into Gmail!")
-                    return True
-                except:
-                    continue
+            try:
+                WebDriverWait(self.driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, _GMAIL_LOADED_SELECTOR))
+                )
+                logger.info("Successfully logged into Gmail")
+                print("Successfully logged into Gmail!")
+                return True
+            except TimeoutException:
+                pass
             
             # Check for security challenges
             if "accounts.google.com" in self.driver.current_url:
-                logging.warning("Still on Google accounts page - may need manual intervention")
+                logger.warning("Still on Google accounts page - may need manual intervention")
                 print("Still on Google accounts page - you may need to manually complete the login")
                 print("Check for security challenges, 2FA prompts, or other verification steps")
                 return False
             
-            logging.info("Successfully logged into Gmail")
+            logger.info("Successfully logged into Gmail")
             print("Successfully logged into Gmail!")
             return True
             
         except TimeoutException as e:
-            logging.error(f"Timeout during Gmail login: {e}")
+            logger.error("Timeout during Gmail login: %s", e)
             print(f"Timeout during login: {e}")
             return False
         except Exception as e:
-            logging.error(f"Error during Gmail login: {e}")
+            logger.error("Error during Gmail login: %s", e)
             print(f"Error during login: {e}")
             return False
     
+    def _find_next_button(self, button_id: str):
+        """Find a login step's Next button, trying the element ID before the CSS fallbacks."""
+        buttons = (
+            self.driver.find_elements(By.ID, button_id) or
+            self.driver.find_elements(By.CSS_SELECTOR, _NEXT_BUTTON_SELECTOR)
+        )
+        if not buttons:
+            raise NoSuchElementException(f"No Next button found for {button_id}")
+        return buttons[0]
+    
+    def _has_existing_session(self, driver=None) -> bool:
+        """Check whether the browser (the main driver by default) is signed in and showing the inbox."""
+        driver = driver or self.driver
+        if "accounts.google.com" in driver.current_url or "#inbox" not in driver.current_url:
+            return False
+        try:
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='main']"))
+            )
+            return True
+        except TimeoutException:
+            return False
+    
     def get_new_emails(self, max_emails: int = 10) -> list:
         """
         Get new emails from Gmail inbox.
@@ -231,190 +491,149 @@ class GmailMonitor:
         to handle Gmail's dynamic interface.
         """
         try:
-            if "mail.google.com/mail/u/0/#inbox" not in self.driver.current_url:
-                self.driver.get("https://mail.google.com/mail/u/0/#inbox")
-                time.sleep(3)
+            # Opened emails live under #inbox/<thread>, so compare the exact URL
+            if self.driver.current_url != _INBOX_URL:
+                self.driver.get(_INBOX_URL)
 
-            email_row_selectors = [
-                "tr[role='row']",
-                "div[role='row']",
-                "div[data-testid='message-row']",
-                "div[class*='message-row']",
-                "tr[class*='message']"
-            ]
+            try:
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(_EMAIL_ROW_SELECTORS)))
+                )
+            except TimeoutException:
+                return []
 
-            email_rows = []
-            for selector in email_row_selectors:
-                try:
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    email_rows = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if email_rows:
-                        break
-                except:
-                    continue
+            inbox_rows = self._list_inbox_rows(_EMAIL_ROW_SELECTORS, max_emails)
+            pending_rows = [
+                metadata for metadata in inbox_rows
+                if metadata.get('id') and not self.processed_emails.is_processed(metadata['id'])
+            ]
 
-            if not email_rows:
-                return []
+            # Fetch bodies in parallel across the driver pool when more than one worker is configured
+            if self.workers > 1 and len(pending_rows) > 1 and self._setup_driver_pool():
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    extracted = list(executor.map(self._extract_with_pooled_driver, pending_rows))
+            else:
+                extracted = [self._extract_email_data(metadata['row'], metadata) for metadata in pending_rows]
 
             new_emails = []
-            for row in email_rows[:max_emails]:
-                try:
-                    email_id = self._get_email_id(row)
-                    if email_id and email_id not in self.processed_emails:
-                        email_data = self._extract_email_data(row)
-                        if email_data and email_data.get('body'):
-                            email_data['id'] = email_id
-                            new_emails.append(email_data)
-                            self.processed_emails.add(email_id)
-                except Exception as e:
-                    continue
+            for metadata, email_data in zip(pending_rows, extracted):
+                if email_data and email_data.get('body'):
+                    email_data['id'] = metadata['id']
+                    new_emails.append(email_data)
+                    self.processed_emails.mark_processed(metadata['id'])
             return new_emails
         except Exception as e:
             return []
     
-    def _get_email_id(self, row) -> Optional[str]:
-        """Extract email ID from row element to prevent duplicate processing."""
+    def _setup_driver_pool(self) -> bool:
+        """
+        Start the worker drivers used for parallel body fetching.
+        
+        Workers reuse the main driver's Google session cookies instead of logging in again.
+        """
+        if self._driver_pool is not None:
+            return True
+        
         try:
-            # Try multiple methods to get email ID
-            email_id = (
-                row.get_attribute("id") or
-                row.get_attribute("data-legacy-thread-id") or
-                row.get_attribute("data-thread-id")
-            )
-            
-            # Clean up the ID if it has a prefix
-            if email_id and email_id.startswith('thread-'):
-                email_id = email_id.replace('thread-', '')
+            # Every cookie in the browser (google.com and accounts.google.com included), not just
+            # those visible to the current page
+            cookies = self.driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+            self._driver_pool = queue.Queue()
+            self._driver_pool.put(self.driver)
+            
+            for _ in range(self.workers - 1):
+                driver = self._create_driver(headless=True)
+                # Set cookies over CDP before the first navigation: loading Gmail signed out
+                # redirects to accounts.google.com, where mail.google.com cookies are rejected
+                for cookie in cookies:
+                    params = {k: v for k, v in cookie.items() if k in _CDP_COOKIE_FIELDS}
+                    if cookie.get("session"):
+                        params.pop("expires", None)
+                    try:
+                        driver.execute_cdp_cmd("Network.setCookie", params)
+                    except Exception:
+                        continue
+                
+                # A worker without a session would burn wait_timeout on every email it's given
+                driver.get(_INBOX_URL)
+                try:
+                    WebDriverWait(driver, 15).until(EC.any_of(
+                        EC.url_contains("accounts.google.com"),
+                        EC.url_contains("#inbox")
+                    ))
+                except TimeoutException:
+                    pass
+                if not self._has_existing_session(driver):
+                    logger.warning("Pooled WebDriver is not signed in to Gmail, leaving it out")
+                    driver.quit()
+                    continue
+                self._pool_drivers.append(driver)
+                self._driver_pool.put(driver)
             
-            return email_id
+            logger.info("Started driver pool with %s workers", len(self._pool_drivers) + 1)
+            return True
             
-        except Exception:
-            return None
+        except Exception as e:
+            logger.warning("Failed to start driver pool, fetching sequentially: %s", e)
+            self._close_driver_pool()
+            return False
+    
+    def _extract_with_pooled_driver(self, metadata: Dict) -> Optional[Dict]:
+        """Extract an email using whichever pooled driver is free."""
+        driver = self._driver_pool.get()
+        try:
+            return self._extract_email_data(metadata['row'], metadata, driver=driver)
+        finally:
+            self._driver_pool.put(driver)
     
-    def _extract_email_data(self, row) -> Optional[Dict]:
+    def _close_driver_pool(self):
+        """Quit the worker drivers; the main driver is closed separately."""
+        for driver in self._pool_drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning("Error closing pooled WebDriver: %s", e)
+        self._pool_drivers = []
+        self._driver_pool = None
+    
+    def _list_inbox_rows(self, row_selectors: List[str], max_emails: int) -> List[Dict]:
+        """List the inbox and read every row's metadata in one round-trip."""
+        return self.driver.execute_script(
+            _INBOX_LIST_SCRIPT, row_selectors, max_emails,
+            _SENDER_SELECTORS, _SUBJECT_SELECTORS, _TIMESTAMP_SELECTORS
+        ) or []
+    
+    def _extract_email_data(self, row, metadata: Optional[Dict] = None, driver=None) -> Optional[Dict]:
         """
         Extract email data from row element.
         
         Gets sender, subject, timestamp, and body content using multiple selector strategies.
+        Row metadata already read by get_new_emails can be passed in to skip reading it again,
+        and a pooled driver can be given to open the email in a different browser.
         """
+        driver = driver or self.driver
         try:
-            # Get sender - try multiple selectors
-            sender = ""
-            sender_selectors = [
-                "td[data-tooltip]",
-                "td[title]",
-                "td[aria-label*='@']",
-                "td span[email]",
-                "td[class*='sender']",
-                "td[class*='from']",
-                "td[role='gridcell'] span[email]",
-                "td[role='gridcell'] span[title*='@']",
-                "td[role='gridcell'] span[aria-label*='@']",
-                "td span[title*='@']",
-                "td span[aria-label*='@']"
-            ]
-            
-            for selector in sender_selectors:
-                try:
-                    sender_element = row.find_element(By.CSS_SELECTOR, selector)
-                    sender = sender_element.get_attribute("data-tooltip") or sender_element.get_attribute("title") or sender_element.get_attribute("aria-label") or sender_element.text
-                    if sender and '@' in sender and sender != "Select":
-                        break
-                except:
-                    continue
-            
-            # Get subject - try multiple selectors
-            subject = ""
-            subject_selectors = [
-                "td[data-thread-id] span",
-                "td[class*='subject'] span",
-                "td span[class*='subject']",
-                "td[aria-label*='Subject']",
-                "td span[dir='ltr']",
-                "td[class*='message'] span"
-            ]
-            
-            for selector in subject_selectors:
-                try:
-                    subject_element = row.find_element(By.CSS_SELECTOR, selector)
-                    subject = subject_element.text
-                    if subject and len(subject) > 0:
-                        break
-                except:
-                    continue
-            
-            # Get timestamp if available
-            timestamp = ""
-            timestamp_selectors = [
-                "td[data-tooltip] span",
-                "td[class*='date']",
-                "td[aria-label*='Date']",
-                "td span[class*='date']"
-            ]
-            
-            for selector in timestamp_selectors:
-                try:
-                    time_element = row.find_element(By.CSS_SELECTOR, selector)
-                    timestamp = time_element.text
-                    if timestamp and len(timestamp) > 0:
-                        break
-                except:
-                    pass
-            
-            # Try to click email row with multiple strategies to handle interception
-            click_success = False
-            click_strategies = [
-                # Strategy 1: Try to dismiss overlays first, then click
-                lambda: self._click_with_overlay_dismissal(row),
-                # Strategy 2: Use JavaScript click
-                lambda: self._click_with_javascript(row),
-                # Strategy 3: Try to scroll to element and click
-                lambda: self._click_with_scroll(row),
-                # Strategy 4: Try to click on a specific part of the row
-                lambda: self._click_on_row_part(row),
-                # Strategy 5: Last resort - try direct click
-                lambda: row.click()
-            ]
-            
-            for i, strategy in enumerate(click_strategies):
-                try:
-                    strategy()
-                    time.sleep(2)
-                    # Check if we successfully opened an email (look for email body)
-                    body_selectors = [
-                        "div[role='main'] div[dir='ltr']",
-                        "div[role='main'] div[data-message-id]",
-                        "div[role='main'] div[class*='message']",
-                        "div[data-testid='message-content']"
-                    ]
-                    
-                    for body_selector in body_selectors:
-                        try:
-                            body_elements = self.driver.find_elements(By.CSS_SELECTOR, body_selector)
-                            if any(len(el.text) > 20 for el in body_elements):
-                                click_success = True
-                                break
-                        except:
-                            continue
-                    
-                    if click_success:
-                        break
-                        
-                except Exception as e:
-                    logging.warning(f"Click strategy {i+1} failed: {e}")
-                    continue
+            # Get sender, subject and timestamp in a single WebDriver round-trip
+            if metadata is None:
+                metadata = self.driver.execute_script(
+                    _ROW_METADATA_SCRIPT, row, _SENDER_SELECTORS, _SUBJECT_SELECTORS, _TIMESTAMP_SELECTORS
+                ) or {}
+            sender = metadata.get('sender') or ""
+            subject = metadata.get('subject') or ""
+            timestamp = metadata.get('timestamp') or ""
+            
+            thread_id = metadata.get('thread_id')
+            if not thread_id:
+                logger.warning("No thread ID found for email row")
+                return None
             
-            if not click_success:
-                logging.warning("All click strategies failed for email row")
+            # Open the thread directly instead of clicking the row and navigating back
+            if not self._open_thread(thread_id, driver):
+                logger.warning("Could not open email thread %s", thread_id)
                 return None
             
             # Get email body content
-            body = self._get_email_body()
-            
-            # Go back to inbox
-            self._return_to_inbox()
+            body = self._get_email_body(driver)
             
             return {
                 'sender': sender.strip(),
@@ -424,83 +643,34 @@ class GmailMonitor:
             }
             
         except Exception as e:
-            logging.warning(f"Error extracting email data: {e}")
+            logger.warning("Error extracting email data: %s", e)
             return None
     
-    def _click_with_overlay_dismissal(self, row):
-        """Try to dismiss overlays before clicking."""
+    def _open_thread(self, thread_id: str, driver) -> bool:
+        """Navigate straight to an email thread and wait for its body to render."""
+        previous_bodies = driver.find_elements(By.CSS_SELECTOR, "div.a3s")
+        driver.get(f"{_INBOX_URL}/{thread_id}")
         try:
-            # Try to dismiss notification prompts
-            overlay_selectors = [
-                "span[id='link_enable_notifications_hide']",
-                "div[class='vh']",
-                "div[tabindex='0'][role='button'][class='bBe']",
-                "div[aria-label*='Close']",
-                "button[aria-label*='Close']",
-                "span[class='a8k']"
-            ]
-            
-            for selector in overlay_selectors:
-                try:
-                    overlay = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if overlay.is_displayed():
-                        overlay.click()
-                        time.sleep(1)
-                except:
-                    continue
-            
-            # Now try to click the row
-            row.click()
-            
-        except Exception as e:
-            raise e
-    
-    def _click_with_javascript(self, row):
-        """Use JavaScript to click the element."""
+            # Hash navigation keeps the page, so wait for the previous thread to go away first
+            if previous_bodies:
+                WebDriverWait(driver, 5).until(EC.staleness_of(previous_bodies[0]))
+        except TimeoutException:
+            pass
         try:
-            self.driver.execute_script("arguments[0].click();", row)
-        except Exception as e:
-            raise e
-    
-    def _click_with_scroll(self, row):
-        """Scroll to element and then click."""
-        try:
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", row)
-            time.sleep(1)
-            row.click()
-        except Exception as e:
-            raise e
-    
-    def _click_on_row_part(self, row):
-        """Try to click on a specific part of the row that might be clickable."""
-        try:
-            # Try to find clickable elements within the row
-            clickable_selectors = [
-                "td[role='gridcell']",
-                "td[class*='subject']",
-                "td[class*='sender']",
-                "span[dir='ltr']"
-            ]
-            
-            for selector in clickable_selectors:
-                try:
-                    element = row.find_element(By.CSS_SELECTOR, selector)
-                    element.click()
-                    return
-                except:
-                    continue
-            
-            # If no specific element found, try the row itself
-            row.click()
-            
-        except Exception as e:
-            raise e
+            WebDriverWait(driver, self.wait_timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.a3s"))
+            )
+            return True
+        except TimeoutException:
+            return False
     
-    def _get_email_body(self) -> str:
+    def _get_email_body(self, driver=None) -> str:
         """Extract email body content using multiple selector strategies."""
+        driver = driver or self.driver
         try:
             # Try multiple selectors for email body
             body_selectors = [
+                "div.a3s",
                 "div[role='main'] div[dir='ltr']",
                 "div[role='main'] div[data-message-id]",
                 "div[role='main'] div[class*='message']",
@@ -513,47 +683,57 @@ class GmailMonitor:
                 "div[class*='text']"
             ]
             
-            for selector in body_selectors:
-                try:
-                    body_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in body_elements:
-                        body_text = element.text
-                        if body_text and len(body_text) > 20:  # Minimum meaningful content
-                            return body_text
-                except:
-                    continue
+            # Search every selector and element in one round-trip instead of a .text call per element,
+            # always in priority order so div.a3s wins whenever it exists
+            result = driver.execute_script(_EMAIL_BODY_SCRIPT, body_selectors) or {}
+            return result.get('text') or ""
             
-            # Fallback: get all text from main area
-            try:
-                main_area = self.driver.find_element(By.CSS_SELECTOR, "div[role='main']")
-                return main_area.text
-            except:
-                return ""
-                
         except Exception as e:
-            logging.warning(f"Error getting email body: {e}")
+            logger.warning("Error getting email body: %s", e)
             return ""
     
-    def _return_to_inbox(self):
-        """Navigate back to inbox after viewing an email."""
+    def mark_email_as_read(self, email_id: str) -> bool:
+        """Mark an email as read."""
+        return self.mark_emails_as_read([email_id])
+    
+    def mark_emails_as_read(self, email_ids: List[str]) -> bool:
+        """
+        Mark a batch of emails as read in one interaction.
+        
+        Ticks the matching inbox rows in a single script call and then sends Gmail's
+        Shift+I shortcut, so keyboard shortcuts must be enabled in the Gmail settings.
+        """
+        if not email_ids:
+            return True
         try:
-            self.driver.get("https://mail.google.com/mail/u/0/#inbox")
-            time.sleep(2)
+            if self.driver.current_url != _INBOX_URL:
+                self.driver.get(_INBOX_URL)
+            WebDriverWait(self.driver, self.wait_timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(_EMAIL_ROW_SELECTORS)))
+            )
+            
+            selected = self.driver.execute_script(_SELECT_ROWS_SCRIPT, _EMAIL_ROW_SELECTORS, list(email_ids))
+            if not selected:
+                logger.warning("None of the emails to mark as read are visible in the inbox")
+                return False
+            
+            ActionChains(self.driver).key_down(Keys.SHIFT).send_keys("i").key_up(Keys.SHIFT).perform()
+            logger.info("Marked %s emails as read", selected)
+            return True
+            
         except Exception as e:
-            logging.warning(f"Error returning to inbox: {e}")
-    
-    def mark_email_as_read(self, email_id: str) -> bool:
-        """Mark an email as read (placeholder for future functionality)."""
-        # TODO: Implement email marking functionality
-        return True
+            logger.warning("Error marking emails as read: %s", e)
+            return False
     
     def refresh_inbox(self):
         """Refresh the Gmail inbox to get latest emails."""
         try:
             self.driver.refresh()
-            time.sleep(3)
+            WebDriverWait(self.driver, self.wait_timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='main']"))
+            )
         except Exception as e:
-            logging.warning(f"Error refreshing inbox: {e}")
+            logger.warning("Error refreshing inbox: %s", e)
     
     def is_logged_in(self) -> bool:
         """Check if currently logged into Gmail."""
@@ -569,12 +749,13 @@ class GmailMonitor:
     
     def close(self):
         """Close the browser and cleanup resources."""
+        self._close_driver_pool()
         try:
             if self.driver:
                 self.driver.quit()
-                logging.info("WebDriver closed successfully")
+                logger.info("WebDriver closed successfully")
         except Exception as e:
-            logging.error(f"Error closing WebDriver: {e}")
+            logger.error("Error closing WebDriver: %s", e)
     
     def __enter__(self):
         """Context manager entry point."""
@@ -1,18 +1,29 @@
+import argparse
 import os
 import sys
 import time
 import re
 from config import Config
 from gmail_monitor import GmailMonitor
+from gmail_imap_monitor import GmailImapMonitor
 from url_scanner import SimpleURLScanner
+from safe_browsing import GoogleSafeBrowsingClient
+
+_URL_PATTERN = re.compile(r'https?://[\w\-\.]+(?:[:\d]+)?(?:/[\w/_.-]*)?(?:\?[\w&=%.]*)?(?:#[\w\.-]*)?')
 
 def extract_urls_from_text(text: str):
-    if not text:
+    # Every match starts with "http", so skip the regex engine entirely for bodies without it
+    if not text or 'http' not in text:
         return []
-    url_pattern = r'https?://[\w\-\.]+(?:[:\d]+)?(?:/[\w/_.-]*)?(?:\?[\w&=%.]*)?(?:#[\w\.-]*)?'
-    return list(set(re.findall(url_pattern, text)))
+    # dict.fromkeys dedups in one pass and keeps the order URLs appear in the email
+    return list(dict.fromkeys(_URL_PATTERN.findall(text)))
 
 def main():
+    parser = argparse.ArgumentParser(description="Scan URLs found in recent Gmail emails")
+    parser.add_argument('--debug-browser', action='store_true',
+                        help="use the Selenium/Chrome backend instead of IMAP (for diagnosing login issues)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("GMAIL URL SCANNER BOT")
     print("=" * 60)
@@ -25,13 +36,24 @@ def main():
         print("⚠️  Warning: URLSCAN_API_KEY not set. Some scans may be limited.")
     
     print("\n🔧 Setting up components...")
-    gmail_monitor = GmailMonitor(config.GMAIL_USERNAME, config.GMAIL_PASSWORD, headless=False)
-    url_scanner = SimpleURLScanner(config.URLSCAN_API_KEY)
-    
-    print("🌐 Setting up Chrome WebDriver...")
-    if not gmail_monitor.setup_driver():
-        print("❌ Failed to setup Chrome WebDriver")
-        return
+    # IMAP is the production path; Chrome only starts when explicitly asked for
+    backend = 'selenium' if args.debug_browser else getattr(config, 'GMAIL_BACKEND', 'imap')
+    if backend == 'selenium':
+        gmail_monitor = GmailMonitor(
+            config.GMAIL_USERNAME, config.GMAIL_PASSWORD, headless=False,
+            workers=getattr(config, 'GMAIL_WORKERS', 1)
+        )
+    else:
+        gmail_monitor = GmailImapMonitor(config.GMAIL_USERNAME, config.GMAIL_PASSWORD)
+    url_scanner = SimpleURLScanner(
+        config.URLSCAN_API_KEY, cache_path=getattr(config, 'SCAN_CACHE_PATH', 'scan_cache.sqlite3')
+    )
+    
+    if backend == 'selenium':
+        print("🌐 Setting up Chrome WebDriver...")
+        if not gmail_monitor.setup_driver():
+            print("❌ Failed to setup Chrome WebDriver")
+            return
     
     print("📧 Logging into Gmail...")
     if not gmail_monitor.login_gmail():
@@ -45,6 +67,7 @@ def main():
     if not emails:
         print("ℹ️  No emails found to process.")
         gmail_monitor.close()
+        url_scanner.close()
         return
     
     print("\n" + "=" * 60)
@@ -75,6 +98,7 @@ def main():
     if not all_urls:
         print("\nℹ️  No URLs found in any emails.")
         gmail_monitor.close()
+        url_scanner.close()
         return
     
     print("\n" + "=" * 60)
@@ -85,14 +109,34 @@ def main():
         'completed': [],
         'failed': [],
         'blocked': [],
-        'timeout': []
+        'timeout': [],
+        'not_listed': []
     }
     
+    results = {}
+    urls_to_scan = all_urls
+    safe_browsing_key = getattr(config, 'SAFE_BROWSING_API_KEY', None)
+    if safe_browsing_key:
+        # Cheap bulk pre-filter: only URLs Safe Browsing flags go through a full urlscan.io scan
+        print(f"\n🛡️  Checking {len(all_urls)} URLs against Google Safe Browsing...")
+        sb_client = GoogleSafeBrowsingClient(safe_browsing_key)
+        hits = sb_client.lookup_batch(all_urls)
+        sb_client.close()
+        if hits is not None:
+            urls_to_scan = [url for url in all_urls if url in hits]
+            for url in all_urls:
+                if url not in hits:
+                    results[url] = {'safe_browsing': 'no_match'}
+            print(f"   • Not listed by Safe Browsing (not sent to urlscan.io): {len(all_urls) - len(urls_to_scan)}")
+    
+    print(f"\n🔍 Scanning {len(urls_to_scan)} URLs...")
+    results.update(url_scanner.scan_urls(urls_to_scan))
+    
     for i, url in enumerate(all_urls, 1):
-        print(f"\n🔍 Scanning URL {i}/{len(all_urls)}: {url}")
+        print(f"\n🔍 Scan result {i}/{len(all_urls)}: {url}")
         print("-" * 50)
         
-        result = url_scanner.scan_url(url)
+        result = results[url]
         
         if 'error' in result:
             error_msg = result['error']
@@ -102,12 +146,19 @@ def main():
             elif 'Scan prevented' in str(error_msg):
                 print("🚫 CANNOT SCAN: URL blocked by urlscan.io")
                 scan_results['blocked'].append(url)
+            elif error_msg == 'auth':
+                print("🔑 CANNOT SCAN: urlscan.io rejected the API key")
+                scan_results['failed'].append(url)
             elif 'timeout' in str(error_msg):
                 print("⏰ TIMEOUT: Scan took too long to complete")
                 scan_results['timeout'].append(url)
             else:
                 print(f"❌ ERROR: {error_msg}")
                 scan_results['failed'].append(url)
+        elif result.get('safe_browsing') == 'no_match':
+            # Not a verdict: new phishing URLs are often not on Safe Browsing's lists yet
+            print("🛡️  NOT LISTED by Google Safe Browsing (not scanned by urlscan.io)")
+            scan_results['not_listed'].append(url)
         elif 'verdicts' in result:
             verdicts = result.get('verdicts', {})
             overall = verdicts.get('overall', {})
@@ -142,6 +193,8 @@ def main():
     print(f"   ❌ Failed to scan: {len(scan_results['failed'])}")
     print(f"   🚫 Blocked by urlscan.io: {len(scan_results['blocked'])}")
     print(f"   ⏰ Timed out: {len(scan_results['timeout'])}")
+    if scan_results['not_listed']:
+        print(f"   🛡️  Not listed by Safe Browsing (not scanned): {len(scan_results['not_listed'])}")
     
     if scan_results['completed']:
         malicious_count = sum(1 for r in scan_results['completed'] if r['malicious'])
@@ -155,6 +208,7 @@ def main():
                     print(f"      • {result['url']} (Score: {result['score']})")
     
     gmail_monitor.close()
+    url_scanner.close()
     print("\n✅ Bot finished successfully!")
 
 if __name__ == "__main__":
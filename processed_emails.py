@@ -0,0 +1,40 @@
+"""
+Processed Email Tracking for URL Scanner Bot
+
+Shared by the Selenium and IMAP monitors so both evict processed IDs the same way.
+"""
+
+from collections import OrderedDict
+
+class ProcessedEmails:
+    """
+    Bounded LRU set of processed email IDs.
+
+    Keeps long-running monitors from growing without limit: once max_size IDs are
+    stored, the least recently seen ones are evicted first.
+    """
+
+    def __init__(self, max_size: int = 50000):
+        """Initialize an empty set holding at most max_size IDs."""
+        self.max_size = max_size
+        self._ids = OrderedDict()
+
+    def is_processed(self, email_id: str) -> bool:
+        """Check if an email was already processed, refreshing its LRU position."""
+        if email_id in self._ids:
+            self._ids.move_to_end(email_id)
+            return True
+        return False
+
+    def mark_processed(self, email_id: str):
+        """Record a processed email, evicting the least recently seen IDs past the limit."""
+        self._ids[email_id] = None
+        self._ids.move_to_end(email_id)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+    def __contains__(self, email_id: str) -> bool:
+        return email_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -0,0 +1,44 @@
+import logging
+import requests
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class GoogleSafeBrowsingClient:
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.endpoint = "https://safebrowsing.googleapis.com/v4/threatMatches:find"
+        self.session = requests.Session()
+        # threatMatches:find accepts at most 500 threat entries per request
+        self.batch_size = 500
+
+    def lookup_batch(self, urls) -> Optional[set]:
+        # Returns the URLs Safe Browsing has a match for, or None if the lookup failed
+        urls = list(urls)
+        hits = set()
+        for start in range(0, len(urls), self.batch_size):
+            batch = urls[start:start + self.batch_size]
+            payload = {
+                "client": {"clientId": "gmail-url-threat-analyser-bot", "clientVersion": "1.0"},
+                "threatInfo": {
+                    "threatTypes": ["MALWARE", "SOCIAL_ENGINEERING", "UNWANTED_SOFTWARE",
+                                    "POTENTIALLY_HARMFUL_APPLICATION"],
+                    "platformTypes": ["ANY_PLATFORM"],
+                    "threatEntryTypes": ["URL"],
+                    "threatEntries": [{"url": url} for url in batch]
+                }
+            }
+            try:
+                resp = self.session.post(self.endpoint, params={"key": self.api_key}, json=payload, timeout=(5, 15))
+                if resp.status_code != 200:
+                    logger.warning("Safe Browsing lookup failed: %s", resp.text)
+                    return None
+                for match in resp.json().get("matches", []):
+                    hits.add(match.get("threat", {}).get("url"))
+            except (requests.RequestException, ValueError) as e:
+                logger.warning("Error during Safe Browsing lookup: %s", e)
+                return None
+        return hits
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,79 @@
+import imaplib
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gmail_imap_monitor import GmailImapMonitor
+
+
+class FakeIdleServer:
+    """Minimal IMAP server that answers CAPABILITY and IDLE with scripted untagged lines."""
+
+    def __init__(self, idle_chunks):
+        self.idle_chunks = idle_chunks
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        conn, _ = self.listener.accept()
+        reader = conn.makefile("rb")
+        conn.sendall(b"* OK fake server ready\r\n")
+        idle_tag = None
+        for line in reader:
+            tag, _, command = line.strip().partition(b" ")
+            if command == b"CAPABILITY":
+                conn.sendall(b"* CAPABILITY IMAP4rev1 IDLE\r\n" + tag + b" OK done\r\n")
+            elif command == b"IDLE":
+                idle_tag = tag
+                for chunk in self.idle_chunks:
+                    conn.sendall(chunk)
+                    time.sleep(0.05)
+            elif tag == b"DONE":
+                conn.sendall(idle_tag + b" OK IDLE terminated\r\n")
+            elif command == b"LOGOUT":
+                conn.sendall(b"* BYE\r\n" + tag + b" OK bye\r\n")
+                break
+        conn.close()
+        self.listener.close()
+
+
+class WaitForNewMailTest(unittest.TestCase):
+    def _monitor_for(self, server):
+        monitor = GmailImapMonitor("user", "password")
+        monitor.connection = imaplib.IMAP4("127.0.0.1", server.port)
+        return monitor
+
+    def test_exists_coalesced_with_continuation(self):
+        server = FakeIdleServer([b"+ idling\r\n* 3 EXISTS\r\n"])
+        monitor = self._monitor_for(server)
+        start = time.monotonic()
+        self.assertTrue(monitor.wait_for_new_mail(timeout=3))
+        self.assertLess(time.monotonic() - start, 1)
+        monitor.logout()
+
+    def test_exists_coalesced_with_other_untagged_line(self):
+        server = FakeIdleServer([b"+ idling\r\n", b"* 1 RECENT\r\n* 4 EXISTS\r\n"])
+        monitor = self._monitor_for(server)
+        start = time.monotonic()
+        self.assertTrue(monitor.wait_for_new_mail(timeout=3))
+        self.assertLess(time.monotonic() - start, 1)
+        monitor.logout()
+
+    def test_times_out_without_new_mail(self):
+        server = FakeIdleServer([b"+ idling\r\n"])
+        monitor = self._monitor_for(server)
+        self.assertFalse(monitor.wait_for_new_mail(timeout=0.5))
+        monitor.logout()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,50 +1,405 @@
+import hashlib
+import logging
+import random
 import requests
+import sqlite3
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+# urlscan.io results run to hundreds of KB; orjson parses them several times faster
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj).encode()
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        # Spend one token, sleeping only when the burst budget is used up.
+        # Holding the lock while sleeping queues other threads behind the wait
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.ts) * self.rate)
+            self.ts = now
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 0
+                self.ts = time.monotonic()
+            else:
+                self.tokens -= 1
+
 
 class SimpleURLScanner:
-    def __init__(self, api_key: str = None):
+    # Submission budget shared by every scanner in the process, since urlscan.io
+    # rate-limits per API key: 2 scans/second with bursts of 4; polling doesn't spend tokens
+    _bucket = TokenBucket(rate=2, burst=4)
+
+    def __init__(self, api_key: str = None, cache_ttl: float = 3600, cache_size: int = 10000,
+                 poll_timeout: float = 90, max_poll_delay: float = 15, cache_path: str = None,
+                 connect_timeout: float = 5, read_timeout: float = 15):
         self.api_key = api_key
         self.base_url = "https://urlscan.io/api/v1/"
+        self.submit_url = self.base_url + "scan/"
         self.headers = {"API-Key": api_key} if api_key else {}
+        # One pooled keep-alive session for every urlscan.io call instead of a new TLS handshake per request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            # Retries are handled by _request_with_retry and the poll loop; adapter-level
+            # retries would stack on top and sleep out uncapped Retry-After headers
+            max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        # Without a timeout a stalled connection would hang past the whole poll budget
+        self.timeout = (connect_timeout, read_timeout)
+        # Recent completed results keyed by normalised URL, so repeated links skip a new scan
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.poll_timeout = poll_timeout
+        self.max_poll_delay = max_poll_delay
+        # Optional on-disk copy of the cache so results survive between bot runs
+        self._db = self._open_cache_db(cache_path) if cache_path else None
+        self._db_lock = threading.Lock()
+        # Scans currently being run, keyed like the cache, so concurrent callers share one submission
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
 
     def scan_url(self, url: str) -> dict:
-        # Submit URL for scanning
-        resp = requests.post(
-            self.base_url + "scan/",
-            json={"url": url, "public": "on"},
-            headers=self.headers
-        )
+        return self.scan_urls([url])[url]
+
+    def scan_urls(self, urls) -> dict:
+        # Submit URLs through the token bucket and poll outstanding scans in between, so
+        # early scans can finish while later URLs are still being submitted and their
+        # processing time on urlscan.io overlaps instead of adding up
+        results = {}
+        to_submit = deque(urls)
+        pending = {}
+        owned = {}
+        waiting = {}
+        auth_failed = False
+        attempt = 0
+        next_poll = None
+
+        def finish(url, result):
+            results[url] = result
+            future = owned.pop(self._cache_key(url), None)
+            if future is not None:
+                with self._inflight_lock:
+                    self._inflight.pop(self._cache_key(url), None)
+                future.set_result(result)
+
+        try:
+            while to_submit or pending:
+                if to_submit and (next_poll is None or time.monotonic() < next_poll):
+                    url = to_submit.popleft()
+                    cached = self._get_cached(url)
+                    if cached is not None:
+                        logger.debug("Using cached scan result for %s", url)
+                        results[url] = cached
+                        continue
+                    if auth_failed:
+                        # The key was rejected once; every other submission would be too
+                        results[url] = {"error": "auth"}
+                        continue
+
+                    # Piggyback on a scan of the same URL that is already in flight,
+                    # whether from this batch or from another thread
+                    key = self._cache_key(url)
+                    with self._inflight_lock:
+                        future = self._inflight.get(key)
+                        if future is None:
+                            future = self._inflight[key] = Future()
+                            owned[key] = future
+                        else:
+                            waiting[url] = future
+                            continue
+
+                    scan_id, error = self._submit(url)
+                    auth_failed = error == {"error": "auth"}
+                    if error:
+                        finish(url, error)
+                        continue
+                    # Build the result URL once per scan rather than on every poll; each scan
+                    # gets the full poll_timeout budget from its own submission
+                    pending[url] = (f"{self.base_url}result/{scan_id}/", time.monotonic() + self.poll_timeout)
+                    if next_poll is None:
+                        attempt = 0
+                        next_poll = time.monotonic() + self._poll_delay(attempt, None)
+                    continue
+
+                time.sleep(max(0.0, next_poll - time.monotonic()))
+                attempt += 1
+                retry_after = None
+                for url, (result_url, deadline) in list(pending.items()):
+                    result, server_delay = self._check_result(url, result_url, attempt)
+                    if server_delay is not None:
+                        retry_after = max(retry_after or 0.0, server_delay)
+                    if result is None and time.monotonic() >= deadline:
+                        logger.warning("Timeout waiting for scan result for %s after %s seconds", url, self.poll_timeout)
+                        result = {"error": "timeout"}
+                    if result is not None:
+                        del pending[url]
+                        if "error" not in result:
+                            self._store_cached(url, result)
+                        finish(url, result)
+                if pending:
+                    # However long Retry-After asks for, don't sleep past the earliest scan's deadline
+                    next_poll = min(time.monotonic() + self._poll_delay(attempt, retry_after),
+                                    min(deadline for _, deadline in pending.values()))
+                else:
+                    next_poll = None
+        finally:
+            # Never leave other callers blocked on a scan this call abandoned
+            for url in list(pending):
+                finish(url, {"error": "scan_aborted"})
+            for key, future in list(owned.items()):
+                with self._inflight_lock:
+                    self._inflight.pop(key, None)
+                future.set_result({"error": "scan_aborted"})
+
+        for url, future in waiting.items():
+            results[url] = future.result()
+        return results
+
+    def _poll_delay(self, attempt: int, retry_after):
+        # Jittered exponential backoff so fast scans are picked up after ~1 s, slow ones
+        # cost fewer requests, and concurrent bots don't poll in lockstep.
+        # The server's Retry-After wins when sent
+        if retry_after is not None:
+            return retry_after
+        return min(self.max_poll_delay, 2 ** attempt) * (1 + random.uniform(-0.5, 0.5))
+
+    def close(self):
+        # Release the pooled connections and the disk cache
+        self.session.close()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _cache_key(url: str) -> str:
+        # Scheme and host are case-insensitive and the fragment never reaches the server
+        parts = urlsplit(url)
+        return parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower(), fragment="").geturl()
+
+    def _open_cache_db(self, path: str):
+        try:
+            # Autocommit plus WAL lets several scanner processes share the file
+            db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS cache (url_hash BLOB PRIMARY KEY, ts REAL, payload BLOB)")
+            db.execute("DELETE FROM cache WHERE ts <= ?", (time.time() - self.cache_ttl,))
+            return db
+        except sqlite3.Error as e:
+            logger.warning("Could not open scan cache %s, using memory only: %s", path, e)
+            return None
+
+    def _get_cached(self, url: str):
+        key = self._cache_key(url)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if time.monotonic() - stored_at >= self.cache_ttl:
+                    del self._cache[key]
+                    return None
+                self._cache.move_to_end(key)
+                return result
+        return self._get_cached_on_disk(key)
+
+    def _get_cached_on_disk(self, key: str):
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT ts, payload FROM cache WHERE url_hash = ? AND ts > ?",
+                    (hashlib.sha256(key.encode()).digest(), time.time() - self.cache_ttl)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Error reading scan cache: %s", e)
+            return None
+        if row is None:
+            return None
+        stored_at, payload = row
+        result = _loads(payload)
+        # Keep it in memory for the rest of its TTL
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() - (time.time() - stored_at), result)
+            self._cache.move_to_end(key)
+            self._trim_cache()
+        return result
+
+    def _store_cached(self, url: str, result: dict):
+        key = self._cache_key(url)
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), result)
+            self._cache.move_to_end(key)
+            self._trim_cache()
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (url_hash, ts, payload) VALUES (?, ?, ?)",
+                    (hashlib.sha256(key.encode()).digest(), time.time(), _dumps(result))
+                )
+        except sqlite3.Error as e:
+            logger.warning("Error writing scan cache: %s", e)
+
+    def _trim_cache(self):
+        # Caller must hold _cache_lock
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _submit(self, url: str):
+        # Submit URL for scanning, returning (scan_id, None) or (None, error result)
+        try:
+            resp = self._request_with_retry(
+                "POST", self.submit_url, rate_limited=True, json={"url": url, "public": "on"}
+            )
+        except requests.RequestException as e:
+            logger.warning("Error submitting %s: %s", url, e)
+            return None, {"error": str(e)}
+
+        if resp.status_code in (401, 403):
+            logger.warning("urlscan.io rejected the API key while submitting %s", url)
+            return None, {"error": "auth"}
         if resp.status_code != 200:
-            print(f"Error submitting URL: {resp.text}")
-            return {"error": resp.text}
-        
-        scan_id = resp.json().get("uuid")
-        print(f"Submitted {url} for scanning. Scan ID: {scan_id}")
-        
-        # Rate limiting: wait between submissions
-        time.sleep(2)
-        
-        # Poll for result with longer timeout
-        max_attempts = 30  # 30 attempts × 3 seconds = 1.5 minutes
-        for attempt in range(max_attempts):
-            time.sleep(3)
+            logger.warning("Error submitting %s: %s", url, resp.text)
+            return None, {"error": resp.text}
+
+        try:
+            body = _loads(resp.content)
+        except ValueError:
+            body = None
+        scan_id = body.get("uuid") if isinstance(body, dict) else None
+        if not scan_id:
+            logger.warning("urlscan.io returned no scan ID for %s: %s", url, resp.text[:200])
+            return None, {"error": "invalid submission response"}
+        logger.debug("Submitted %s for scanning. Scan ID: %s", url, scan_id)
+        return scan_id, None
+
+    def _check_result(self, url: str, result_url: str, attempt: int):
+        # Returns (final result or None while still pending, server-requested delay or None).
+        # Auth failures and unexpected 4xx end the scan at once; 429, 5xx and
+        # connection problems are transient and just wait for the next poll
+        try:
+            # Probe with HEAD first: urlscan.io answers 404 until the scan has finished,
+            # so pending polls never download the result body
+            probe = self.session.head(result_url, allow_redirects=False, timeout=self.timeout)
+            retry_after = self._retry_after(probe)
+            outcome = self._classify_poll(url, probe, attempt, retry_after, allow_405=True)
+            if outcome is not None:
+                return outcome
+
+            # Finished (or HEAD not supported): fetch the full result once. Single-shot like the
+            # probe, so a 429/5xx goes back to the poll loop instead of sleeping inside the round
+            resp = self.session.get(result_url, timeout=self.timeout)
+            retry_after = self._retry_after(resp)
+            outcome = self._classify_poll(url, resp, attempt, retry_after)
+            if outcome is not None:
+                return outcome
+
+            result = _loads(resp.content)
+            if not isinstance(result, dict):
+                raise ValueError("result is not a JSON object")
+            state = result.get("task", {}).get("state")
+
+            if state == "error":
+                logger.warning("Scan failed for %s: %s", url, result.get('task', {}).get('error', 'Unknown error'))
+                return {"error": "scan_failed"}, retry_after
+            elif state == "pending":
+                logger.debug("Scan still pending for %s (attempt %d)", url, attempt)
+            elif state in ("done", None):
+                # Finished results come back with 200 and usually no task state at all
+                logger.debug("Scan completed for %s", url)
+                return result, retry_after
+            else:
+                logger.debug("Scan state for %s: %s (attempt %d)", url, state, attempt)
+            return None, retry_after
+
+        except (requests.RequestException, ValueError) as e:
+            logger.debug("Error checking scan status for %s: %s", url, e)
+        return None, None
+
+    def _request_with_retry(self, method: str, url: str, max_retries: int = 3, rate_limited: bool = False, **kwargs):
+        # Retry connection errors, timeouts, 429 and 5xx with jittered exponential backoff
+        # (honouring Retry-After); any other response is returned straight away.
+        # rate_limited requests spend a submission token on every attempt
+        for attempt in range(max_retries):
+            last_try = attempt == max_retries - 1
+            if rate_limited:
+                self._bucket.take()
             try:
-                result = requests.get(self.base_url + f"result/{scan_id}/").json()
-                state = result.get("task", {}).get("state")
-                
-                if state == "done":
-                    print(f"Scan completed for {url}")
-                    return result
-                elif state == "pending":
-                    print(f"Scan still pending for {url} (attempt {attempt + 1}/{max_attempts})")
-                elif state == "error":
-                    print(f"Scan failed for {url}: {result.get('task', {}).get('error', 'Unknown error')}")
-                    return {"error": "scan_failed"}
-                else:
-                    print(f"Scan state for {url}: {state} (attempt {attempt + 1}/{max_attempts})")
-                    
-            except Exception as e:
-                print(f"Error checking scan status for {url}: {e}")
-                
-        print(f"Timeout waiting for scan result for {url} after {max_attempts * 3} seconds")
-        return {"error": "timeout"} 
\ No newline at end of file
+                resp = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_try:
+                    raise
+                logger.debug("%s %s failed (%s), retrying", method, url, e)
+                delay = None
+            else:
+                if last_try or (resp.status_code != 429 and resp.status_code < 500):
+                    return resp
+                logger.debug("%s %s returned %s, retrying", method, url, resp.status_code)
+                delay = self._retry_after(resp)
+            if delay is None:
+                delay = 2 ** attempt * (1 + random.random() * 0.5)
+            time.sleep(delay)
+
+    def _classify_poll(self, url: str, resp, attempt: int, retry_after, allow_405: bool = False):
+        # None when the response holds a finished result, otherwise the (result, delay) to report
+        status = resp.status_code
+        if status == 200 or (allow_405 and status == 405):
+            return None
+        if status == 404:
+            logger.debug("Scan still pending for %s (attempt %d)", url, attempt)
+            return None, retry_after
+        if status in (401, 403):
+            logger.warning("urlscan.io rejected the API key while checking %s", url)
+            return {"error": "auth"}, retry_after
+        if status == 429:
+            logger.debug("Rate limited while checking %s (Retry-After: %s)", url, retry_after)
+            return None, retry_after
+        if status >= 500:
+            logger.debug("urlscan.io server error %s for %s, will retry (attempt %d)", status, url, attempt)
+            return None, retry_after
+        logger.warning("Unexpected status %s checking scan for %s", status, url)
+        return {"error": f"HTTP {status}"}, retry_after
+
+    @staticmethod
+    def _retry_after(resp):
+        # Retry-After in seconds, or None when absent or given as an HTTP date
+        value = resp.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None